@@ -1,46 +1,156 @@
+import asyncio
+import functools
+import os
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from repo_analyzer import GitAnalyzer
+import orjson
 import uvicorn
 
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson's C encoder, which is much faster than
+    the stdlib json module on the large /analyze payloads and serializes
+    datetime objects natively.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
 app = FastAPI(
     title="Git Visual Evolution API",
     description="Backend for analyzing GitHub repositories for D3 visualization.",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
 )
 
+# The API is read-only and cookie-less, so credentials stay off: with a wildcard
+# origin that lets Starlette send a static "*" header instead of echoing each
+# request's Origin. Preflight results are cached by browsers for a day.
+# Keep this the last add_middleware() call so it wraps (runs before) any other middleware.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], 
-    allow_credentials=True,
-    allow_methods=["*"],
+    allow_origins=["*"],
+    allow_credentials=False,
+    allow_methods=["GET"],
     allow_headers=["*"],
+    max_age=86400,
 )
 
+# Max number of commits mined per repository
+HISTORY_LIMIT = 2000
+
+# Analyses (git I/O and libgit2 object reads) run off the event loop on this pool
+_POOL = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# One lock per local clone: concurrent requests for the same repository are
+# serialized, so they never clone/fetch into the same directory at once and
+# later requests are served from the payload cache.
+_REPO_LOCKS: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+async def run_locked(analyzer: GitAnalyzer, func: Callable[..., Any], *args) -> Any:
+    """
+    Runs a blocking analyzer method on the worker pool while holding the repo's lock.
+    """
+    async with _REPO_LOCKS[analyzer.local_path]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_POOL, func, *args)
+
+@functools.lru_cache(maxsize=64)
+def _cached_analyzer(
+    url: str, include_stats: bool, include_loc_history: bool
+) -> GitAnalyzer:
+    return GitAnalyzer(
+        url,
+        history_limit=HISTORY_LIMIT,
+        include_stats=include_stats,
+        include_loc_history=include_loc_history,
+    )
+
+def get_analyzer(
+    url: str, include_stats: bool = True, include_loc_history: bool = False
+) -> GitAnalyzer:
+    """
+    Returns the analyzer for a repository and set of options, reusing the
+    instance (and its in-memory payload memo) across requests.
+    Least recently used analyzers are evicted; the on-disk cache still covers them.
+    """
+    # Positional call so equivalent requests always hit the same cache key
+    return _cached_analyzer(url, include_stats, include_loc_history)
+
 @app.get("/")
 def read_root():
     return {"status": "online", "message": "Access /analyze?url=<github_url> to start."}
 
 @app.get("/analyze")
-def analyze_repo(url: str):
+async def analyze_repo(
+    url: str, include_stats: bool = True, include_loc_history: bool = False
+):
     """
     Main endpoint to trigger analysis.
     
     - **url**: Full HTTPS URL of the git repository.
+    - **include_stats**: Set to false to skip per-commit diff stats (metadata-only history).
+    - **include_loc_history**: Set to true to add per-file stats and LOC snapshots over time.
     """
     if not url or "github.com" not in url:
         raise HTTPException(status_code=400, detail="Invalid GitHub URL provided.")
 
     try:
-        analyzer = GitAnalyzer(url, history_limit=2000)
-        data = analyzer.analyze()
-        return data
+        analyzer = get_analyzer(
+            url,
+            include_stats=include_stats,
+            include_loc_history=include_loc_history,
+        )
+        data = await run_locked(analyzer, analyzer.analyze)
+        # Returned as a response object so FastAPI skips jsonable_encoder
+        return ORJSONResponse(data)
     except Exception as e:
         print(f"INTERNAL SERVER ERROR: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/analyze/stream")
+async def analyze_repo_stream(
+    url: str, include_stats: bool = True, include_loc_history: bool = False
+):
+    """
+    Streaming variant of /analyze, returned as newline-delimited JSON.
+    Each line is one event: "meta", then one "commit" per commit (newest first),
+    then the "file_tree". Failures after streaming has started are reported
+    as a final "error" event.
+
+    - **url**: Full HTTPS URL of the git repository.
+    - **include_stats**: Set to false to skip per-commit diff stats (metadata-only history).
+    - **include_loc_history**: Set to true to add per-file stats and LOC snapshots over time.
+    """
+    if not url or "github.com" not in url:
+        raise HTTPException(status_code=400, detail="Invalid GitHub URL provided.")
+
+    analyzer = get_analyzer(
+        url,
+        include_stats=include_stats,
+        include_loc_history=include_loc_history,
+    )
+
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        async with _REPO_LOCKS[analyzer.local_path]:
+            try:
+                async for event in iterate_in_threadpool(analyzer.iter_analysis()):
+                    yield orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE)
+            except Exception as e:
+                print(f"INTERNAL SERVER ERROR: {str(e)}")
+                error = {"type": "error", "detail": str(e)}
+                yield orjson.dumps(error, option=orjson.OPT_APPEND_NEWLINE)
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
     
 @app.get("/check_update") 
-def check_update(url: str, last_commit_hash: str):
+async def check_update(url: str, last_commit_hash: str):
     """
     Endpoint to check if the repository has new commits since the last analysis.
     
@@ -50,8 +160,10 @@ def check_update(url: str, last_commit_hash: str):
         raise HTTPException(status_code=400, detail="Invalid GitHub URL provided.")
 
     try:
-        analyzer = GitAnalyzer(url, history_limit=2000)
-        has_update = analyzer.check_for_updates(last_commit_hash) 
+        analyzer = get_analyzer(url)
+        has_update = await run_locked(
+            analyzer, analyzer.check_for_updates, last_commit_hash
+        )
         return {"has_update": has_update}
     except Exception as e:
         print(f"INTERNAL SERVER ERROR: {str(e)}")
@@ -3,55 +3,395 @@ Module to analyze Git repositories: clone/pull, extract file structure and commi
 """
 
 import os
+import functools
 import subprocess
 import shutil
-from typing import Dict, List, Any, Optional
-from git import Repo, GitCommandError
-from pydriller import Repository
-from datetime import datetime
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+import orjson
+import pygit2
 
 CACHE_DIR = "cache"
 
-IGNORED_FOLDERS = {
-    ".git",
-    ".idea",
-    ".vscode",
-    "__pycache__",
-    "node_modules",
-    "venv",
-    "env",
-    "dist",
-    "build",
-    "coverage",
-}
+# Seconds during which a clone is considered fresh after its last remote check
+REMOTE_CHECK_TTL = 30
+
+# Only the first MAX_LOC_FILE_SIZE bytes of a file are counted ("truncated" nodes)
+MAX_LOC_FILE_SIZE = 16 * 1024 * 1024
+READ_CHUNK_SIZE = 1024 * 1024
+
+# Commits handed to each history-mining worker per batch (amortizes pickling)
+MINING_CHUNK_SIZE = 32
+
+# Leading bytes checked for NUL to detect binary content (same window as git)
+BINARY_SNIFF_SIZE = 8192
+
+# Extensions treated as binary without reading the file
+BINARY_EXTENSIONS = frozenset(
+    {
+        ".png",
+        ".jpg",
+        ".jpeg",
+        ".gif",
+        ".ico",
+        ".pdf",
+        ".zip",
+        ".tar",
+        ".gz",
+        ".exe",
+        ".so",
+        ".dll",
+        ".o",
+        ".a",
+        ".class",
+        ".wasm",
+        ".mp4",
+        ".mp3",
+        ".woff",
+        ".woff2",
+        ".ttf",
+    }
+)
+
+IGNORED_FOLDERS = frozenset(
+    {
+        ".git",
+        ".idea",
+        ".vscode",
+        "__pycache__",
+        "node_modules",
+        "venv",
+        "env",
+        "dist",
+        "build",
+        "coverage",
+    }
+)
+
+
+def _file_extension(name: str) -> str:
+    """
+    Lower-cased extension of a file name, with the same result as
+    os.path.splitext (dotfiles like ".gitignore" have none) but a single
+    str.rpartition instead of splitext's generic path handling.
+
+    Args:
+        name (str): File name (no directory part).
+    Returns:
+        str: The extension including its dot, or "" if there is none.
+    """
+    stem, dot, ext = name.rpartition(".")
+    if not dot or not stem.strip("."):
+        return ""
+    return "." + ext.lower()
+
+
+def _count_newlines(blob: pygit2.Blob) -> Optional[int]:
+    """
+    Counts lines in a blob without decoding it or copying it whole into a
+    Python bytes object: the content is read through a zero-copy memoryview
+    in READ_CHUNK_SIZE slices, each counted with bytes.count(b"\\n").
+    Only the first MAX_LOC_FILE_SIZE bytes are counted.
+
+    Args:
+        blob (pygit2.Blob): The file's blob object.
+    Returns:
+        Optional[int]: Number of lines (a trailing line without "\\n" counts as one),
+            or None if the content looks binary (NUL byte in its first BINARY_SNIFF_SIZE bytes).
+    """
+    with memoryview(blob) as view:
+        size = len(view)
+        if size == 0:
+            return 0
+
+        head = bytes(view[:BINARY_SNIFF_SIZE])
+        if b"\x00" in head:
+            return None
+
+        lines = head.count(b"\n")
+        end = min(size, MAX_LOC_FILE_SIZE)
+        for start in range(len(head), end, READ_CHUNK_SIZE):
+            chunk = bytes(view[start : min(start + READ_CHUNK_SIZE, end)])
+            lines += chunk.count(b"\n")
+
+        if size > MAX_LOC_FILE_SIZE:
+            return lines
+        return lines + (view[-1] != ord("\n"))
+
+
+# Monotonic time of the last remote check per clone path (see GitAnalyzer._sync_remote)
+_LAST_REMOTE_CHECK: Dict[str, float] = {}
+
+# Depth each clone was last cloned/fetched with, None for full history
+# (see GitAnalyzer._has_enough_history)
+_CLONE_DEPTHS: Dict[str, Optional[int]] = {}
+
+# Process-wide libgit2 handles keyed by clone path, so packfile indexes and
+# object caches stay warm between requests instead of being reopened each time
+_REPOSITORIES: Dict[str, pygit2.Repository] = {}
+_REPOSITORIES_LOCK = threading.Lock()
+
+# Bumped whenever a shared handle is dropped, so mining workers reopen theirs too
+_REPOSITORY_GENERATIONS: Dict[str, int] = {}
+
+
+def _open_repository(path: str) -> pygit2.Repository:
+    """
+    Returns the shared pygit2 handle for a clone, opening it on first use.
+    libgit2 re-reads refs from disk and rescans packfiles when an object is
+    missing, but it keeps the shallow boundary it loaded at open time, so
+    _fetch_latest() drops the handle after every fetch.
+
+    Args:
+        path (str): Path of the local clone.
+    Returns:
+        pygit2.Repository: The open repository.
+    """
+    with _REPOSITORIES_LOCK:
+        repo = _REPOSITORIES.get(path)
+        if repo is None:
+            repo = _REPOSITORIES[path] = pygit2.Repository(path)
+        return repo
+
+
+def _forget_repository(path: str) -> None:
+    """
+    Drops the shared handle for a clone (e.g. before its directory is deleted).
+    """
+    with _REPOSITORIES_LOCK:
+        _REPOSITORIES.pop(path, None)
+        _REPOSITORY_GENERATIONS[path] = _REPOSITORY_GENERATIONS.get(path, 0) + 1
+
+
+class GitCommandError(subprocess.CalledProcessError):
+    """
+    A failed git CLI call. Unlike CalledProcessError, its message includes
+    git's own explanation (stderr), e.g. an unknown repository or an auth failure.
+    """
+
+    def __str__(self) -> str:
+        stderr = (self.stderr or "").strip()
+        return f"{super().__str__()}\n{stderr}" if stderr else super().__str__()
+
+
+def _run_git(*args: str) -> str:
+    """
+    Runs the git CLI and returns its stdout.
+
+    Raises:
+        GitCommandError: If git exits with a non-zero status.
+    """
+    try:
+        return subprocess.run(
+            ["git", *args], check=True, capture_output=True, text=True
+        ).stdout
+    except subprocess.CalledProcessError as e:
+        raise GitCommandError(e.returncode, e.cmd, e.stdout, e.stderr) from None
+
+
+def _first_parent_diff(repo: pygit2.Repository, commit: pygit2.Commit) -> pygit2.Diff:
+    """
+    Tree-to-tree diff of a commit against its first parent (merges included).
+    Building it only compares tree entries; blob contents are loaded later
+    and only if line stats are requested.
+    """
+    if commit.parents:
+        return repo.diff(commit.parents[0], commit)
+    # Root commit: everything in its tree counts as an insertion
+    return commit.tree.diff_to_tree(swap=True)
+
+
+def _diff_stats(
+    diff: pygit2.Diff, include_stats: bool, include_loc_history: bool
+) -> Dict[str, Any]:
+    """
+    Extracts the requested numstat-style counts from a diff.
+    Only counts are read: never patch text or hunks.
+
+    Returns:
+        Dict[str, Any]: The stats fields of a commit object.
+    """
+    data = {}
+
+    if include_stats:
+        stats = diff.stats
+        data["files_changed"] = stats.files_changed
+        data["impact"] = stats.insertions + stats.deletions
+        data["insertions"] = stats.insertions
+        data["deletions"] = stats.deletions
+
+    if include_loc_history:
+        file_stats = []
+        for patch in diff:
+            _, insertions, deletions = patch.line_stats
+            file_stats.append(
+                {
+                    "path": patch.delta.new_file.path,
+                    "insertions": insertions,
+                    "deletions": deletions,
+                }
+            )
+        data["file_stats"] = file_stats
+
+    return data
+
+
+def _commit_stats(
+    repo: pygit2.Repository,
+    commit_id: str,
+    include_stats: bool,
+    include_loc_history: bool,
+) -> Dict[str, Any]:
+    """
+    Diffs one commit against its first parent.
+
+    Args:
+        repo (pygit2.Repository): The clone holding the commit.
+        commit_id (str): Hex id of the commit.
+        include_stats (bool): Compute insertions/deletions totals.
+        include_loc_history (bool): Compute per-file stats.
+    Returns:
+        Dict[str, Any]: The stats fields of the commit object.
+    """
+    diff = _first_parent_diff(repo, repo[commit_id])
+    return _diff_stats(diff, include_stats, include_loc_history)
+
+
+# Clones opened by a history-mining worker process: path -> (generation, repository)
+_worker_repos: Dict[str, Tuple[int, pygit2.Repository]] = {}
+
+
+def _mine_commit_stats(
+    path: str,
+    generation: int,
+    commit_id: str,
+    include_stats: bool,
+    include_loc_history: bool,
+) -> Dict[str, Any]:
+    """
+    Process-pool entry point for _commit_stats(). Each worker keeps its clones
+    open between tasks and reopens one when the parent's generation moved on.
+    """
+    cached = _worker_repos.get(path)
+    if cached is None or cached[0] != generation:
+        cached = _worker_repos[path] = (generation, pygit2.Repository(path))
+    return _commit_stats(cached[1], commit_id, include_stats, include_loc_history)
+
+
+# History-mining process pool shared by all analyses, created on first use
+_MINING_POOL: Optional[ProcessPoolExecutor] = None
+_MINING_POOL_LOCK = threading.Lock()
+
+
+def _mining_pool() -> ProcessPoolExecutor:
+    """
+    Returns the shared history-mining pool, creating it on first use.
+    Workers are spawned (not forked): the parent holds shared libgit2 handles
+    used by other threads, and forking them mid-operation is unsafe.
+    """
+    global _MINING_POOL
+    with _MINING_POOL_LOCK:
+        if _MINING_POOL is None:
+            _MINING_POOL = ProcessPoolExecutor(
+                max_workers=os.cpu_count(),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _MINING_POOL
+
+
+def _discard_mining_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Drops a broken mining pool (e.g. a worker was OOM-killed) so the next
+    analysis creates a fresh one instead of failing forever.
+    """
+    global _MINING_POOL
+    with _MINING_POOL_LOCK:
+        if _MINING_POOL is pool:
+            _MINING_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_commit_stats(
+    path: str,
+    commit_ids: List[str],
+    include_stats: bool,
+    include_loc_history: bool,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Mines the stats of commit_ids on the shared pool, yielding them in order.
+    If the pool breaks, this call fails and the pool is replaced for later ones.
+    """
+    with _REPOSITORIES_LOCK:
+        generation = _REPOSITORY_GENERATIONS.get(path, 0)
+
+    mining_pool = _mining_pool()
+    try:
+        yield from mining_pool.map(
+            _mine_commit_stats,
+            itertools.repeat(path),
+            itertools.repeat(generation),
+            commit_ids,
+            itertools.repeat(include_stats),
+            itertools.repeat(include_loc_history),
+            chunksize=MINING_CHUNK_SIZE,
+        )
+    except BrokenProcessPool:
+        _discard_mining_pool(mining_pool)
+        raise
 
 
 class GitAnalyzer:
     """
     A utility class to manage Git repositories and extract data for visualization.
     Features:
-        1. Clones the repo if not present, else pulls latest changes.
+        1. Clones the repo if not present, else fetches latest changes.
         2. Builds a hierarchical file structure with LOC for visualization.
         3. Extracts commit history for analysis.
     """
 
-    def __init__(self, repo_url: str, history_limit: int = 2000):
+    def __init__(
+        self,
+        repo_url: str,
+        history_limit: int = 2000,
+        include_stats: bool = True,
+        include_loc_history: bool = False,
+    ):
         """
         Initialize the analyzer.
 
         Args:
             repo_url (str): The HTTPS URL of the GitHub repository.
             history_limit (int): Max number of commits to fetch (default: 2000).
+            include_stats (bool): Compute per-commit diff stats (default: True).
+                When False, history only carries hash/msg/author/date/parents.
+            include_loc_history (bool): Add per-file stats to each commit and derive
+                per-file LOC snapshots across the history (default: False).
         """
         self.repo_url = repo_url
         self.repo_name = repo_url.split("/")[-1].replace(".git", "")
         self.local_path = os.path.join(CACHE_DIR, self.repo_name)
         self.history_limit = history_limit
+        self.include_stats = include_stats
+        self.include_loc_history = include_loc_history
+
+        # Per-instance memo of the payload for the current HEAD; one entry is
+        # enough since HEAD only moves forward
+        self._payload_at = functools.lru_cache(maxsize=1)(self._load_or_build_payload)
 
-    def prepare_repo(self) -> None:
+    def prepare_repo(self) -> pygit2.Repository:
         """
         Clones the repository if it does not exist locally.
-        If it exists, performs a 'git pull' to fetch the latest changes.
+        If it exists, syncs it with the remote, skipping the network entirely
+        when it was checked within REMOTE_CHECK_TTL seconds (see _sync_remote).
+
+        Returns:
+            pygit2.Repository: The shared, already-open handle for the clone.
 
         Raises:
             Exception: If network connectivity fails or the URL is invalid.
@@ -62,50 +402,182 @@ class GitAnalyzer:
 
         if os.path.exists(self.local_path):
             try:
-                print(f"[{self.repo_name}] Updating: Pulling latest changes...")
-                repo = Repo(self.local_path)
-                repo.remotes.origin.pull()
-            except GitCommandError as e:
-                print(f"Error pulling repo: {e}")
+                self._sync_remote(max_age=REMOTE_CHECK_TTL)
+            except (subprocess.CalledProcessError, pygit2.GitError) as e:
+                print(f"Error fetching repo: {e}")
+                _forget_repository(self.local_path)
                 shutil.rmtree(self.local_path)
-                Repo.clone_from(self.repo_url, self.local_path)
+                self._clone()
         else:
             print(f"Init: Cloning {self.repo_name}...")
-            Repo.clone_from(self.repo_url, self.local_path)
+            self._clone()
+
+        return _open_repository(self.local_path)
+
+    def _sync_remote(self, max_age: float = 0) -> None:
+        """
+        Helper: Brings an existing clone up to date with as little network work as possible:
+            1. A shallow clone too short for history_limit is always fetched,
+               which deepens it.
+            2. Otherwise nothing is done if the remote was checked less than
+               max_age seconds ago.
+            3. 'git ls-remote origin HEAD' reads the remote tip; if it equals the
+               local HEAD there is nothing to fetch.
+            4. Otherwise falls back to _fetch_latest().
+
+        Args:
+            max_age (float): Freshness window in seconds (0 always checks the remote).
+        """
+        deep_enough = self._has_enough_history()
+
+        last_check = _LAST_REMOTE_CHECK.get(self.local_path)
+        if (
+            deep_enough
+            and last_check is not None
+            and time.monotonic() - last_check < max_age
+        ):
+            print(f"[{self.repo_name}] Checked recently, skipping remote sync.")
+            return
+
+        remote_head = (
+            self._git("ls-remote", "origin", "HEAD").split() if deep_enough else None
+        )
+        if remote_head and remote_head[0] == self.get_head_sha():
+            print(f"[{self.repo_name}] Already at remote HEAD, skipping fetch.")
+        else:
+            print(f"[{self.repo_name}] Updating: Fetching latest changes...")
+            self._fetch_latest()
+
+        _LAST_REMOTE_CHECK[self.local_path] = time.monotonic()
+
+    def _has_enough_history(self) -> bool:
+        """
+        Helper: True if the clone holds the history_limit commits to mine plus
+        the parent of the oldest one. Full (non-shallow) clones always do.
+        Reads the recorded depth, so the hot path never spawns git.
+        """
+        if self.local_path not in _CLONE_DEPTHS:
+            # Depth unknown since a restart: a shallow clone is fetched once to find out
+            if self._is_shallow():
+                return False
+            _CLONE_DEPTHS[self.local_path] = None
+
+        depth = _CLONE_DEPTHS[self.local_path]
+        return depth is None or depth > self.history_limit
+
+    def _is_shallow(self) -> bool:
+        """
+        Helper: True if the clone has a shallow boundary (partial history).
+        """
+        return os.path.exists(os.path.join(self.local_path, ".git", "shallow"))
+
+    def _record_depth(self) -> None:
+        """
+        Helper: Records the depth the clone was just cloned/fetched with.
+        """
+        shallow = self._is_shallow()
+        _CLONE_DEPTHS[self.local_path] = self.history_limit + 1 if shallow else None
+
+    def _clone(self) -> None:
+        """
+        Helper: Shallow-clones only the default branch, deep enough to mine
+        history_limit commits (the extra commit gives the oldest one a parent to diff against).
+        No files are checked out: everything is read from the object database.
+        """
+        _run_git(
+            "clone",
+            "--quiet",
+            "--no-checkout",
+            f"--depth={self.history_limit + 1}",
+            "--single-branch",
+            "--no-tags",
+            self.repo_url,
+            self.local_path,
+        )
+        self._record_depth()
+
+    def _git(self, *args: str) -> str:
+        """
+        Helper: Runs a git command inside the local clone, calling the git CLI
+        directly (no wrapper library on the hot path).
+
+        Returns:
+            str: The command's stdout.
+        Raises:
+            GitCommandError: If git exits with a non-zero status.
+        """
+        return _run_git("-C", self.local_path, *args)
+
+    def _fetch_latest(self) -> bool:
+        """
+        Helper: Runs 'git fetch --prune' and moves the branch to the fetched
+        tip (FETCH_HEAD) only if it points to a different commit.
+        The clone has no checkout, so the move is a soft reset: no working-tree I/O.
+        Shallow clones are fetched at the current history_limit depth, which
+        deepens them if a larger limit is requested than the one they were cloned with.
+
+        Returns:
+            bool: True if HEAD moved to a new commit, False otherwise.
+        """
+        fetch_args = ["fetch", "--quiet", "--prune"]
+        if self._is_shallow():
+            fetch_args.append(f"--depth={self.history_limit + 1}")
+        self._git(*fetch_args, "origin")
+        self._record_depth()
+        # The fetch may have moved the shallow boundary; reopen on next use
+        _forget_repository(self.local_path)
+
+        fetched_sha, head_sha = self._git("rev-parse", "FETCH_HEAD", "HEAD").split()
+        if fetched_sha == head_sha:
+            return False
+
+        self._git("reset", "--quiet", "--soft", "FETCH_HEAD")
+        return True
+
+    def _walk_history(self, repo: pygit2.Repository) -> Iterator[pygit2.Commit]:
+        """
+        Helper: Yields the last history_limit commits reachable from HEAD, newest first.
+        Topological + time order matches 'git log': never a parent before its children.
+        """
+        walker = repo.walk(
+            repo.head.target, pygit2.GIT_SORT_TOPOLOGICAL | pygit2.GIT_SORT_TIME
+        )
+        return itertools.islice(walker, self.history_limit)
 
     def _get_file_authors(self) -> Dict[str, set]:
         """
         Helper: Maps file paths to a set of authors who touched them.
+        Only the diff deltas (paths and status) are read, never file contents.
+        Merge commits are skipped: whoever merged did not author the branch's changes.
         Returns: Dict[filepath, Set[authors]]
         """
         file_authors = {}
-        repo = Repository(self.local_path, order="reverse")
-
-        count = 0
-        for commit in repo.traverse_commits():
-            if count > self.history_limit:
-                break
-
-            for modified_file in commit.modified_files:
-                if modified_file.new_path:
-                    path = modified_file.new_path.replace("\\", "/")
+        repo = _open_repository(self.local_path)
+
+        for commit in self._walk_history(repo):
+            if len(commit.parent_ids) > 1:
+                continue
+            for delta in _first_parent_diff(repo, commit).deltas:
+                if delta.status != pygit2.GIT_DELTA_DELETED:
+                    path = delta.new_file.path
                     if path not in file_authors:
                         file_authors[path] = set()
                     file_authors[path].add(commit.author.name)
-            count += 1
         return file_authors
 
     def get_file_structure(self) -> Dict[str, Any]:
         """
-        Recursively walks the directory to build a hierarchy suitable for
-        d3.hierarchy() and Sunburst charts.
+        Walks the tree of the HEAD commit in the object database (no working-tree I/O)
+        to build a hierarchy suitable for d3.hierarchy() and Sunburst charts.
+        Lines of code are counted directly on blob contents.
 
         Structure format:
         {
             "name": "folder_name",
             "children": [ ... ],
             "value": 150 (Lines of Code, only for files),
-            "extension": ".py" (only for files)
+            "extension": ".py" (only for files),
+            "truncated": true (only for files above MAX_LOC_FILE_SIZE)
         }
 
         Returns:
@@ -114,116 +586,307 @@ class GitAnalyzer:
         print(f"[{self.repo_name}] Mapping authors to files...")
         file_author_map = self._get_file_authors()
 
-        def path_to_dict(path: str) -> Optional[Dict[str, Any]]:
+        def blob_to_dict(blob: pygit2.Blob, name: str, rel_path: str) -> Dict[str, Any]:
             """
-            Recursively builds a dict representing file structure.
+            Builds the leaf node for a single file.
+            Files with a known binary extension are resolved without reading the blob.
             Args:
-                path (str): Current file/directory path.
+                blob (pygit2.Blob): The file's blob object.
+                name (str): File name.
+                rel_path (str): Repo-relative path of the file.
             Returns:
-                dict: Hierarchical representation of files/directories, None for .git
+                dict: File node with LOC, extension and authors.
             """
-
-            name = os.path.basename(path)
-
-            if name in IGNORED_FOLDERS:
-                return None
-
-            if os.path.islink(path):
-                return None
-
-            rel_path = os.path.relpath(path, self.local_path).replace("\\", "/")
-
-            d = {"name": name}
-
-            if os.path.isdir(path):
-
-                children = [
-                    path_to_dict(os.path.join(path, x)) for x in os.listdir(path)
-                ]
-                d["children"] = [c for c in children if c is not None]
-                d["type"] = "folder"
-
-            else:
-                try:
-                    with open(path, "r", encoding="utf-8", errors="replace") as f:
-                        d["value"] = sum(1 for _ in f)
-
-                    _, ext = os.path.splitext(name)
-                    d["extension"] = ext.lower()
-                    d["type"] = "file"
-                    d["authors"] = list(file_author_map.get(rel_path, []))
-
-                except Exception:
-                    d["value"] = 0
-                    d["type"] = "binary"
-
-                    d["authors"] = []
-
+            ext = _file_extension(name)
+
+            loc = None if ext in BINARY_EXTENSIONS else _count_newlines(blob)
+            if loc is None:
+                return {"name": name, "value": 0, "type": "binary", "authors": []}
+
+            d = {
+                "name": name,
+                "value": loc,
+                "extension": ext,
+                "type": "file",
+                "authors": list(file_author_map.get(rel_path, [])),
+            }
+            if blob.size > MAX_LOC_FILE_SIZE:
+                d["truncated"] = True
             return d
 
         print(f"[{self.repo_name}] Analyzing file structure...")
-        root_structure = path_to_dict(self.local_path)
-
-        if root_structure:
-            root_structure["name"] = self.repo_name
+        repo = _open_repository(self.local_path)
+        root_structure = {"name": self.repo_name, "children": [], "type": "folder"}
+
+        # Explicit stack of (tree, folder node, repo-relative folder path)
+        stack = [(repo.head.peel(pygit2.Tree), root_structure, "")]
+        while stack:
+            tree, node, rel_dir = stack.pop()
+
+            for entry in tree:
+                name = entry.name
+                if name in IGNORED_FOLDERS:
+                    continue
+
+                if entry.type_str == "tree":
+                    child = {"name": name, "children": [], "type": "folder"}
+                    node["children"].append(child)
+                    stack.append((repo[entry.id], child, f"{rel_dir}{name}/"))
+
+                # Symlinks are skipped as before; submodules have no blob to count
+                elif (
+                    entry.type_str == "blob"
+                    and entry.filemode != pygit2.GIT_FILEMODE_LINK
+                ):
+                    blob = repo[entry.id]
+                    node["children"].append(blob_to_dict(blob, name, rel_dir + name))
 
         return root_structure
 
     def get_commit_history(self) -> List[Dict[str, Any]]:
         """
-        Extracts commit metadata using PyDriller.
+        Extracts commit metadata by walking the object database with pygit2 (libgit2).
         Traverses in reverse order (newest first) to get the most relevant recent data.
 
+        The stats fields (files_changed, impact, insertions, deletions) are optional:
+        they are only present when the analyzer was created with include_stats=True,
+        since they require diffing every commit against its first parent.
+        "date" is a timezone-aware datetime; orjson renders it as ISO 8601.
+        With include_loc_history=True, each commit also carries "file_stats":
+        the insertions/deletions of every file it touched.
+
         Returns:
             List[Dict[str, Any]]: A list of commit objects containing author, date, and stats.
         """
-        commits_data = []
+        return list(self.iter_commit_history())
+
+    def iter_commit_history(self) -> Iterator[Dict[str, Any]]:
+        """
+        Generator version of get_commit_history(): yields each commit object
+        as soon as it is mined instead of building the full list.
 
+        Runs in two phases: the cheap walk collects commit metadata first, then
+        the per-commit diffs (the dominant cost) are spread over the shared
+        process pool; a single batch of commits is mined in-process instead.
+        Results are consumed in walk order, so the output stays newest first.
+
+        Yields:
+            Dict[str, Any]: A commit object containing author, date, and stats.
+        """
         print(
             f"[{self.repo_name}] Mining commit history (Limit: {self.history_limit})..."
         )
 
-        repo = Repository(self.local_path, order="reverse")
+        repo = _open_repository(self.local_path)
+        branch = [repo.head.shorthand]
 
-        count = 0
-        for commit in repo.traverse_commits():
-            if count > self.history_limit:
-                break
+        commits = []
+        for commit in self._walk_history(repo):
+            committer_tz = timezone(timedelta(minutes=commit.commit_time_offset))
 
-            commits_data.append(
+            commits.append(
                 {
-                    "hash": commit.hash,
-                    "msg": commit.msg.split("\n")[0],
+                    "hash": str(commit.id),
+                    "msg": commit.message.split("\n", 1)[0],
                     "author": commit.author.name,
-                    "date": commit.committer_date.isoformat(),
-                    "files_changed": len(commit.modified_files),
-                    "impact": commit.insertions + commit.deletions,
-                    "insertions": commit.insertions,
-                    "deletions": commit.deletions,
-                    "parents": list(commit.parents),
-                    "branch": commit.branches,  
+                    "date": datetime.fromtimestamp(commit.commit_time, tz=committer_tz),
+                    "parents": [str(p) for p in commit.parent_ids],
+                    "branch": branch,
                 }
             )
-            count += 1
 
-        return commits_data
+        if not (self.include_stats or self.include_loc_history) or not commits:
+            yield from commits
+            return
+
+        commit_ids = [data["hash"] for data in commits]
+        if len(commit_ids) <= MINING_CHUNK_SIZE:
+            # A single batch: not worth the round trip to the process pool
+            stats = (
+                _commit_stats(
+                    repo, commit_id, self.include_stats, self.include_loc_history
+                )
+                for commit_id in commit_ids
+            )
+        else:
+            stats = _pool_commit_stats(
+                self.local_path,
+                commit_ids,
+                self.include_stats,
+                self.include_loc_history,
+            )
+
+        for data, commit_stats in zip(commits, stats):
+            data.update(commit_stats)
+            yield data
+
+    def get_loc_history(self, history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Derives per-file LOC over time without reading any file at a historical
+        revision. Starting from each file's LOC at HEAD, the per-file stats of every
+        commit are reverse-applied while walking the history newest first:
+            loc_before = loc_after - insertions + deletions
+
+        Only the first-parent chain of HEAD is followed: a merge's stats already
+        contain its side branch (they are diffed against the first parent), so
+        reverse-applying the side-branch commits as well would count them twice.
+
+        Args:
+            history (List[Dict[str, Any]]): Commits from get_commit_history(),
+                mined with include_loc_history=True (newest first).
+        Returns:
+            List[Dict[str, Any]]: One {"hash", "path", "loc"} snapshot per file
+                touched by a first-parent commit, giving that file's LOC right after it.
+        """
+        repo = _open_repository(self.local_path)
+        head_tree = repo.head.peel(pygit2.Tree)
+
+        loc_by_path = {}
+        snapshots = []
+        next_hash = history[0]["hash"] if history else None
+        for commit in history:
+            # Topological order: a commit's first parent always comes after it
+            if commit["hash"] != next_hash:
+                continue
+            next_hash = commit["parents"][0] if commit["parents"] else None
+
+            for file_stat in commit["file_stats"]:
+                path = file_stat["path"]
+                if path not in loc_by_path:
+                    # Untouched by any newer commit, so it still matches HEAD
+                    loc_by_path[path] = self._head_loc(repo, head_tree, path)
+
+                loc = loc_by_path[path]
+                snapshots.append({"hash": commit["hash"], "path": path, "loc": loc})
+                loc_by_path[path] = max(
+                    loc - file_stat["insertions"] + file_stat["deletions"], 0
+                )
+
+        return snapshots
+
+    @staticmethod
+    def _head_loc(repo: pygit2.Repository, head_tree: pygit2.Tree, path: str) -> int:
+        """
+        Helper: LOC of a file in the HEAD tree (0 if absent, binary, or no
+        longer a file, e.g. now a folder or a submodule).
+        """
+        try:
+            entry = head_tree[path]
+        except KeyError:
+            return 0
+        if entry.type_str != "blob":
+            return 0
+        return _count_newlines(repo[entry.id]) or 0
+
+    def get_head_sha(self) -> str:
+        """
+        Returns:
+            str: The commit id that HEAD of the local clone points to.
+        """
+        return str(_open_repository(self.local_path).head.target)
+
+    def _payload_cache_path(self, head_sha: str) -> str:
+        """
+        Helper: Location of the cached analyze() payload for a given HEAD.
+        The key covers every option that changes the payload.
+        """
+        stats_suffix = "" if self.include_stats else "-nostats"
+        loc_suffix = "-loc" if self.include_loc_history else ""
+        options = f"{self.history_limit}{stats_suffix}{loc_suffix}"
+        return os.path.join(CACHE_DIR, f"{self.repo_name}@{head_sha}-{options}.json")
+
+    def _store_payload(self, head_sha: str, payload: Dict[str, Any]) -> None:
+        """
+        Helper: Writes the payload to the on-disk cache and removes payloads
+        cached for older HEADs of this repository, which can no longer be hit.
+        """
+        cache_path = self._payload_cache_path(head_sha)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(payload))
+        os.replace(tmp_path, cache_path)
+
+        prefix = f"{self.repo_name}@"
+        for name in os.listdir(CACHE_DIR):
+            if (
+                name.startswith(prefix)
+                and name.endswith(".json")
+                and not name.startswith(f"{prefix}{head_sha}-")
+            ):
+                os.remove(os.path.join(CACHE_DIR, name))
+
+    def _build_meta(self) -> Dict[str, Any]:
+        """
+        Helper: Metadata block shared by analyze() and iter_analysis().
+        """
+        return {
+            "repo_name": self.repo_name,
+            "analyzed_at": datetime.now(),
+        }
 
     def analyze(self) -> Dict[str, Any]:
         """
         Orchestrates the analysis process.
+        Results are cached per HEAD commit, in memory on this instance and on
+        disk, so re-analyzing a repository with no new commits skips the tree
+        walk and history mining.
 
         Returns:
             Dict[str, Any]: The complete payload for the D3 Frontend.
         """
         self.prepare_repo()
-        return {
-            "meta": {
-                "repo_name": self.repo_name,
-                "analyzed_at": datetime.now().isoformat(),
-            },
+        return self._payload_at(self.get_head_sha())
+
+    def _load_or_build_payload(self, head_sha: str) -> Dict[str, Any]:
+        """
+        Helper: Loads the payload for a HEAD from the on-disk cache, or builds
+        and stores it.
+        """
+        cache_path = self._payload_cache_path(head_sha)
+        if os.path.exists(cache_path):
+            print(f"[{self.repo_name}] Cache hit for {head_sha[:7]}...")
+            with open(cache_path, "rb") as f:
+                return orjson.loads(f.read())
+
+        history = self.get_commit_history()
+        payload = {
+            "meta": self._build_meta(),
             "file_tree": self.get_file_structure(),
-            "history": self.get_commit_history(),
+            "history": history,
         }
+        if self.include_loc_history:
+            payload["loc_history"] = self.get_loc_history(history)
+
+        self._store_payload(head_sha, payload)
+        return payload
+
+    def iter_analysis(self) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming counterpart of analyze(). Yields the payload piece by piece as
+        {"type": ..., "data": ...} events so the client can start rendering
+        before the analysis is complete:
+            1. One "meta" event.
+            2. One "commit" event per commit, newest first.
+            3. A "loc_history" event, only with include_loc_history=True.
+            4. A final "file_tree" event.
+
+        Yields:
+            Dict[str, Any]: The next event of the analysis.
+        """
+        self.prepare_repo()
+
+        yield {"type": "meta", "data": self._build_meta()}
+
+        history = []
+        for commit in self.iter_commit_history():
+            if self.include_loc_history:
+                history.append(commit)
+            yield {"type": "commit", "data": commit}
+
+        if self.include_loc_history:
+            yield {"type": "loc_history", "data": self.get_loc_history(history)}
+
+        yield {"type": "file_tree", "data": self.get_file_structure()}
 
     def check_for_updates(self, last_commit_hash: str) -> bool:
         """
@@ -236,22 +899,12 @@ class GitAnalyzer:
             bool: True if there are new commits, False otherwise.
         """
         try:
-            print(f"[{self.repo_name}] Pulling latest changes...")
+            print(f"[{self.repo_name}] Checking remote for changes...")
 
-            subprocess.run(
-                ["git", "-C", self.local_path, "pull"],
-                check=True,
-                stdout=subprocess.DEVNULL,  # Hide spammy output
-                stderr=subprocess.DEVNULL,
-            )
+            # Polling exists to detect changes, so the freshness window is not applied
+            self._sync_remote()
 
-            current_hash = (
-                subprocess.check_output(
-                    ["git", "-C", self.local_path, "rev-parse", "HEAD"]
-                )
-                .decode("utf-8")
-                .strip()
-            )
+            current_hash = self.get_head_sha()
 
             last_commit_hash = last_commit_hash.strip()
 
@@ -60,7 +60,9 @@ export class DataProcessor {
         const cleanHistory = history.map(d => ({
             ...d,
             dateObj: new Date(d.date),
-            value: d.insertions // Use insertions as the metric for "Activity"
+            // Use insertions as the metric for "Activity",
+            // falling back to commit count when the backend omitted stats
+            value: d.insertions ?? 1
         })).sort((a, b) => a.dateObj - b.dateObj);
 
         // 2. Identify Top Authors (e.g., Top 10 by total insertions)
@@ -118,8 +120,8 @@ export class DataProcessor {
             hash: d.hash,
             author: d.author,
             msg: d.msg,
-            // Impact is insertions + deletions, provided by backend
-            impact: d.impact,
+            // Impact is insertions + deletions, provided by backend (optional)
+            impact: d.impact ?? 0,
             dateObj: new Date(d.date) // or parseDate(d.date) if format changes
         })).sort((a, b) => a.dateObj - b.dateObj);
     }
@@ -127,7 +129,8 @@ export class DataProcessor {
     static processCommitGraph(history) {
         if (!history) return { nodes: [], links: [] };
 
-        const nodes = history.map(d => ({ ...d, id: d.hash }));
+        // Stats are optional (include_stats=false): default impact for the radius scale
+        const nodes = history.map(d => ({ ...d, id: d.hash, impact: d.impact ?? 0 }));
         const links = [];
         const nodeIds = new Set(nodes.map(n => n.id));
 